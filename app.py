@@ -6,8 +6,13 @@
 # - Total Score = Sum(Activity Scores) + Participation Score
 #   Participation Score = (total_participation / max_total_participation) * 5
 
+import atexit
+import io
+import json
 import streamlit as st
 import sqlite3
+import threading
+import numpy as np
 import pandas as pd
 from datetime import date
 
@@ -20,246 +25,422 @@ if not st.runtime.exists():
 
 
 # ---------- DB Utilities ----------
+def _open_con() -> sqlite3.Connection:
+    con = sqlite3.connect(DB_PATH, check_same_thread=False)
+    # WAL lets get_read_con() read committed data while get_con() writes
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("PRAGMA temp_store=MEMORY")
+    con.execute("PRAGMA mmap_size=268435456")
+    con.execute("PRAGMA cache_size=-20000")
+    con.execute("PRAGMA busy_timeout=5000")
+    atexit.register(_close_con, con)
+    return con
+
+
+@st.cache_resource(show_spinner=False)
 def get_con():
-    return sqlite3.connect(DB_PATH)
+    """Shared write connection per process, reused across reruns and sessions."""
+    return _open_con()
+
+
+@st.cache_resource(show_spinner=False)
+def get_read_con():
+    """
+    Separate connection for the readers. Under WAL each query sees the last
+    committed snapshot, never a transaction still open on get_con().
+    """
+    return _open_con()
+
+
+@st.cache_resource(show_spinner=False)
+def _write_lock():
+    """
+    Process-wide lock for writes on the shared connection: Streamlit runs each
+    session in its own thread, and one transaction must not interleave another.
+    """
+    return threading.Lock()
+
+
+@st.cache_resource(show_spinner=False)
+def _read_lock():
+    """Sessions share the reader connection too; one query on it at a time."""
+    return threading.Lock()
+
+
+def _close_con(con):
+    # refresh planner stats for the tables this process queried, then close
+    try:
+        con.execute("PRAGMA optimize")
+    finally:
+        con.close()
 
 
 def init_db():
     con = get_con()
-    cur = con.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS answers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id TEXT NOT NULL,
-            date_week TEXT NOT NULL,
-            question_no INTEGER NOT NULL,
-            question TEXT NOT NULL,
-            answer TEXT NOT NULL,
-            group_name TEXT,
-            checked INTEGER DEFAULT 0
-        );
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS questions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date_week TEXT NOT NULL,
-            question_no INTEGER NOT NULL,
-            question TEXT NOT NULL,
-            UNIQUE(date_week, question_no) ON CONFLICT REPLACE
-        );
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS student_logins (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id TEXT NOT NULL,
-            date_week TEXT NOT NULL,
-            logged_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(student_id, date_week) ON CONFLICT IGNORE
-        );
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS class_scores (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id TEXT NOT NULL,
-            date_week TEXT NOT NULL,
-            score REAL,
-            note TEXT,
-            UNIQUE(student_id, date_week) ON CONFLICT REPLACE
-        );
-        """
-    )
-    # participation table per student per date
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS participation (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id TEXT NOT NULL,
-            date_week TEXT NOT NULL,
-            participation INTEGER DEFAULT 0,
-            UNIQUE(student_id, date_week) ON CONFLICT REPLACE
-        );
-        """
-    )
+    with _write_lock(), con:
+        con.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS answers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_id TEXT NOT NULL,
+                date_week TEXT NOT NULL,
+                question_no INTEGER NOT NULL,
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                group_name TEXT,
+                checked INTEGER DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS questions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date_week TEXT NOT NULL,
+                question_no INTEGER NOT NULL,
+                question TEXT NOT NULL,
+                UNIQUE(date_week, question_no) ON CONFLICT REPLACE
+            );
+            CREATE TABLE IF NOT EXISTS student_logins (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_id TEXT NOT NULL,
+                date_week TEXT NOT NULL,
+                logged_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(student_id, date_week) ON CONFLICT IGNORE
+            );
+            CREATE TABLE IF NOT EXISTS class_scores (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_id TEXT NOT NULL,
+                date_week TEXT NOT NULL,
+                score REAL,
+                note TEXT,
+                UNIQUE(student_id, date_week) ON CONFLICT REPLACE
+            );
+            -- participation table per student per date
+            CREATE TABLE IF NOT EXISTS participation (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_id TEXT NOT NULL,
+                date_week TEXT NOT NULL,
+                participation INTEGER DEFAULT 0,
+                UNIQUE(student_id, date_week) ON CONFLICT REPLACE
+            );
+            -- global weighting scheme (single row, id = 1) – not used yet, but kept for future
+            CREATE TABLE IF NOT EXISTS score_weights (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                w_answers REAL NOT NULL DEFAULT 1.0,
+                w_class REAL NOT NULL DEFAULT 1.0,
+                w_part REAL NOT NULL DEFAULT 1.0
+            );
+
+            -- dashboard queries all filter by date_week
+            CREATE INDEX IF NOT EXISTS idx_answers_date_student
+                ON answers(date_week, student_id, question_no);
+            -- (date_week, logged_at) returns the login list already in order
+            CREATE INDEX IF NOT EXISTS idx_logins_date_at
+                ON student_logins(date_week, logged_at, student_id);
+            CREATE INDEX IF NOT EXISTS idx_class_date ON class_scores(date_week);
+            CREATE INDEX IF NOT EXISTS idx_part_date ON participation(date_week);
+            -- Score Overview sums per student: index-only, already in student order
+            CREATE INDEX IF NOT EXISTS idx_class_sid_score ON class_scores(student_id, score);
+            CREATE INDEX IF NOT EXISTS idx_part_sid_p ON participation(student_id, participation);
+            """
+        )
 
-    # ensure group_name column exists on answers
-    cur.execute("PRAGMA table_info(answers)")
-    existing_cols = [row[1] for row in cur.fetchall()]
-    if "group_name" not in existing_cols:
-        cur.execute("ALTER TABLE answers ADD COLUMN group_name TEXT")
-
-    # global weighting scheme (single row, id = 1) – not used yet, but kept for future
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS score_weights (
-            id INTEGER PRIMARY KEY CHECK (id = 1),
-            w_answers REAL NOT NULL DEFAULT 1.0,
-            w_class REAL NOT NULL DEFAULT 1.0,
-            w_part REAL NOT NULL DEFAULT 1.0
-        );
-        """
-    )
+        cur = con.cursor()
+        # user_version records applied migrations, so table_info runs once per DB
+        cur.execute("PRAGMA user_version")
+        version = cur.fetchone()[0]
+        if version < 1:
+            # ensure group_name column exists on answers
+            cur.execute("PRAGMA table_info(answers)")
+            existing_cols = [row[1] for row in cur.fetchall()]
+            if "group_name" not in existing_cols:
+                cur.execute("ALTER TABLE answers ADD COLUMN group_name TEXT")
+            cur.execute("PRAGMA user_version = 1")
+        if version < 2:
+            # one row per (student, date, question) so save_answers can upsert;
+            # keep the newest copy of any duplicate left by older versions
+            cur.execute(
+                """
+                DELETE FROM answers WHERE id NOT IN (
+                    SELECT MAX(id) FROM answers
+                    GROUP BY student_id, date_week, question_no
+                )
+                """
+            )
+            cur.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS ux_answers_sdq ON answers(student_id, date_week, question_no)"
+            )
+            cur.execute("PRAGMA user_version = 2")
+
+        # populate sqlite_stat1 once so the planner picks the indexes
+        cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_stat1'"
+        )
+        if cur.fetchone() is None:
+            cur.execute("ANALYZE")
+        cur.execute("PRAGMA optimize")
+
+
+def _as_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """Store the repeated ID/label columns as categoricals (int codes)."""
+    cols = ("student_id", "date_week", "group_name")
+    return df.astype({c: "category" for c in cols if c in df.columns})
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _csv_bytes(df: pd.DataFrame) -> bytes:
+    """Write the CSV straight into a bytes buffer; cached across reruns."""
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False, encoding="utf-8")
+    return buf.getvalue()
 
-    con.commit()
-    con.close()
 
+@st.cache_resource(show_spinner=False)
+def _init_once():
+    """Run init_db once per process instead of on every script rerun."""
+    init_db()
+    return True
 
-DEFAULT_QUESTIONS = [
+
+# rows per page of the all-dates answer view
+ANSWER_PAGE_SIZE = 5000
+
+# immutable so callers get their own list only when they need one
+DEFAULT_QUESTIONS = (
     "Explain one key concept you learned today.",
     "Give an example related to the concept.",
     "What is one question you still have?",
-]
+)
 
 
+@st.cache_data(ttl=30, show_spinner=False)
 def load_questions(date_week: str | None):
     if not date_week:
-        return DEFAULT_QUESTIONS.copy()
-    con = get_con()
-    df = pd.read_sql_query(
-        "SELECT question_no, question FROM questions WHERE date_week=? ORDER BY question_no",
-        con,
-        params=[date_week],
-    )
-    con.close()
-    if df.empty:
-        return DEFAULT_QUESTIONS.copy()
-    q = df.sort_values("question_no")["question"].tolist()
-    return q if len(q) > 0 else DEFAULT_QUESTIONS.copy()
+        return list(DEFAULT_QUESTIONS)
+    with _read_lock():
+        cur = get_read_con().execute(
+            "SELECT question FROM questions WHERE date_week=? ORDER BY question_no",
+            (date_week,),
+        )
+        rows = cur.fetchall()
+    return [row[0] for row in rows] or list(DEFAULT_QUESTIONS)
 
 
 def save_question_set(date_week: str, questions: list[str]):
+    stripped = [q.strip() for q in questions]
+    rows = [(date_week, idx, q) for idx, q in enumerate(stripped, start=1) if q]
+    blanks = [(date_week, idx) for idx, q in enumerate(stripped, start=1) if not q]
     con = get_con()
-    cur = con.cursor()
-    cur.execute("DELETE FROM questions WHERE date_week=?", (date_week,))
-    for idx, q in enumerate([q.strip() for q in questions], start=1):
-        if q:
-            cur.execute(
-                "INSERT INTO questions (date_week, question_no, question) VALUES (?,?,?)",
-                (date_week, idx, q),
-            )
-    con.commit()
-    con.close()
+    with _write_lock(), con:
+        con.execute("BEGIN IMMEDIATE")
+        # UNIQUE(date_week, question_no) ON CONFLICT REPLACE overwrites in place;
+        # only numbers that are blank or past the end need deleting
+        con.executemany(
+            "INSERT INTO questions (date_week, question_no, question) VALUES (?,?,?)",
+            rows,
+        )
+        con.executemany(
+            "DELETE FROM questions WHERE date_week=? AND question_no=?", blanks
+        )
+        con.execute(
+            "DELETE FROM questions WHERE date_week=? AND question_no>?",
+            (date_week, len(stripped)),
+        )
+    load_questions.clear()
+    list_question_dates.clear()
 
 
+@st.cache_data(ttl=30, show_spinner=False)
 def list_question_dates():
-    con = get_con()
-    df = pd.read_sql_query(
-        "SELECT DISTINCT date_week FROM questions ORDER BY date_week DESC", con
-    )
-    con.close()
-    return df["date_week"].tolist()
+    with _read_lock():
+        cur = get_read_con().execute(
+            "SELECT DISTINCT date_week FROM questions ORDER BY date_week DESC"
+        )
+        return [row[0] for row in cur.fetchall()]
 
 
+@st.cache_data(ttl=30, show_spinner=False)
 def list_answer_dates():
-    con = get_con()
-    df = pd.read_sql_query(
-        "SELECT DISTINCT date_week FROM answers ORDER BY date_week DESC", con
-    )
-    con.close()
-    return df["date_week"].tolist()
+    with _read_lock():
+        cur = get_read_con().execute(
+            "SELECT DISTINCT date_week FROM answers ORDER BY date_week DESC"
+        )
+        return [row[0] for row in cur.fetchall()]
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def count_answers() -> int:
+    """Total answer rows, for bounding the all-dates pager."""
+    with _read_lock():
+        return get_read_con().execute("SELECT COUNT(*) FROM answers").fetchone()[0]
 
 
 def save_answers(student_id, date_week, qa_list, group_name=""):
+    group = group_name.strip()
+    rows = [
+        (student_id, date_week, qno, qtext, ans, group) for qno, qtext, ans in qa_list
+    ]
+    last_qno = max((row[2] for row in rows), default=0)
     con = get_con()
-    cur = con.cursor()
-    cur.execute(
-        "DELETE FROM answers WHERE student_id=? AND date_week=?",
-        (student_id, date_week),
-    )
-    for qno, qtext, ans in qa_list:
-        cur.execute(
-            "INSERT INTO answers (student_id, date_week, question_no, question, answer, group_name, checked) VALUES (?,?,?,?,?,?,0)",
-            (student_id, date_week, qno, qtext, ans, group_name.strip()),
+    with _write_lock(), con:
+        con.execute("BEGIN IMMEDIATE")
+        # upsert on ux_answers_sdq, then drop questions beyond the new last one
+        con.executemany(
+            """
+            INSERT INTO answers (student_id, date_week, question_no, question, answer, group_name, checked)
+            VALUES (?,?,?,?,?,?,0)
+            ON CONFLICT(student_id, date_week, question_no) DO UPDATE SET
+                question=excluded.question,
+                answer=excluded.answer,
+                group_name=excluded.group_name,
+                checked=0
+            """,
+            rows,
         )
-    con.commit()
-    con.close()
+        con.execute(
+            "DELETE FROM answers WHERE student_id=? AND date_week=? AND question_no>?",
+            (student_id, date_week, last_qno),
+        )
+    list_answer_dates.clear()
+    count_answers.clear()
+    load_answer_review.clear()
 
 
-def load_answers(date_week=None, student_search=""):
-    con = get_con()
+_SQL_ANSWERS = "SELECT id, student_id, date_week, question_no, question, answer, group_name, checked FROM answers"
+_SQL_ANSWERS_PAGE = " ORDER BY student_id, question_no, id LIMIT ? OFFSET ?"
+
+
+def load_answers(date_week=None, student_search="", limit=None, offset=0):
+    """
+    student_search matches an ID prefix ("S0" -> S001, S002, ...) so the
+    (date_week, student_id) index can seek; a leading "*" ("*12") falls back
+    to a case-insensitive substring scan. limit/offset page the result.
+    """
     where, params = [], []
     if date_week:
         where.append("date_week = ?")
         params.append(date_week)
-    if student_search:
+    if student_search.startswith("*"):
         where.append("student_id LIKE ?")
-        params.append(f"%{student_search}%")
+        params.append(f"%{student_search[1:]}%")
+    elif student_search:
+        # GLOB (unlike LIKE) is index-eligible on the default BINARY collation;
+        # bracket its wildcards so the prefix is matched literally
+        prefix = "".join(f"[{ch}]" if ch in "*?[" else ch for ch in student_search)
+        where.append("student_id GLOB ?")
+        params.append(prefix + "*")
     wh = (" WHERE " + " AND ".join(where)) if where else ""
-    df = pd.read_sql_query(
-        f"SELECT id, student_id, date_week, question_no, question, answer, group_name, checked FROM answers{wh} ORDER BY student_id, question_no",
-        con,
-        params=params,
-    )
-    con.close()
-    return df
+    with _read_lock():
+        df = pd.read_sql_query(
+            _SQL_ANSWERS + wh + _SQL_ANSWERS_PAGE,
+            get_read_con(),
+            params=params + [-1 if limit is None else limit, offset],
+        )
+    return _as_categories(df)
+
+
+# built once at import: one statement text per filter shape
+_SQL_ANSWER_REVIEW = """
+    SELECT
+        a.id, a.student_id, a.date_week, a.question_no, a.question, a.answer,
+        a.group_name,
+        COUNT(*) OVER (PARTITION BY a.student_id, a.date_week) AS "Answer Count",
+        ROUND(COALESCE(c.score, 0.0), 2) AS "Activity Score"
+    FROM answers a
+    LEFT JOIN class_scores c
+        ON c.student_id = a.student_id AND c.date_week = a.date_week
+    {where}
+    ORDER BY a.student_id, a.question_no, a.id
+    LIMIT ? OFFSET ?
+"""
+_SQL_ANSWER_REVIEW_ALL = _SQL_ANSWER_REVIEW.format(where="")
+_SQL_ANSWER_REVIEW_DATE = _SQL_ANSWER_REVIEW.format(where="WHERE a.date_week = ?")
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def load_answer_review(date_week=None, limit=None, offset=0) -> pd.DataFrame:
+    """
+    Answers joined with the per-student answer count and Activity Score,
+    shaped for the teacher's checking table. limit/offset page the result
+    (counts are computed before paging).
+    """
+    page = [-1 if limit is None else limit, offset]
+    if date_week:
+        sql, params = _SQL_ANSWER_REVIEW_DATE, [date_week] + page
+    else:
+        sql, params = _SQL_ANSWER_REVIEW_ALL, page
+    with _read_lock():
+        df = pd.read_sql_query(sql, get_read_con(), params=params)
+    return _as_categories(df)
 
 
 def update_checked(ids, checked=True):
     if not ids:
         return
     con = get_con()
-    cur = con.cursor()
-    cur.execute(
-        f"UPDATE answers SET checked = ? WHERE id IN ({','.join(['?'] * len(ids))})",
-        [1 if checked else 0, *ids],
-    )
-    con.commit()
-    con.close()
+    with _write_lock(), con:
+        # ids travel as one JSON array, so the UPDATE text never depends on len(ids)
+        con.execute(
+            "UPDATE answers SET checked = ? WHERE id IN (SELECT value FROM json_each(?))",
+            (1 if checked else 0, json.dumps([int(i) for i in ids])),
+        )
+    load_answer_review.clear()
 
 
 def log_student_login(student_id: str, date_week: str) -> None:
     """Record a student login for the activity scoring list."""
-    if not student_id or not date_week:
-        return
-    con = get_con()
-    cur = con.cursor()
-    cur.execute(
-        "INSERT OR IGNORE INTO student_logins (student_id, date_week) VALUES (?, ?)",
-        (student_id, date_week),
-    )
-    con.commit()
-    con.close()
+    log_student_logins([(student_id, date_week)])
 
 
-def list_logged_students(date_week: str | None = None) -> pd.DataFrame:
-    """Return DataFrame of students who pressed Login."""
+def log_student_logins(pairs) -> None:
+    """
+    pairs: iterable of (student_id, date_week); one transaction for the batch,
+    e.g. when attendance is imported in bulk.
+    """
+    rows = [(sid, d) for sid, d in pairs if sid and d]
+    if not rows:
+        return
     con = get_con()
-    if date_week:
-        df = pd.read_sql_query(
-            "SELECT student_id, date_week, logged_at FROM student_logins WHERE date_week=? ORDER BY logged_at",
-            con,
-            params=[date_week],
+    with _write_lock(), con:
+        con.executemany(
+            "INSERT OR IGNORE INTO student_logins (student_id, date_week) VALUES (?, ?)",
+            rows,
         )
-    else:
-        df = pd.read_sql_query(
-            "SELECT student_id, date_week, logged_at FROM student_logins ORDER BY logged_at DESC",
-            con,
-        )
-    con.close()
-    return df
+    list_logged_students.clear()
+    _participation_roster.clear()
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def list_logged_students(date_week: str | None = None) -> list[str]:
+    """Return IDs of students who pressed Login, in login order."""
+    with _read_lock():
+        con = get_read_con()
+        if date_week:
+            cur = con.execute(
+                "SELECT student_id FROM student_logins WHERE date_week=? ORDER BY logged_at",
+                (date_week,),
+            )
+        else:
+            cur = con.execute(
+                "SELECT student_id FROM student_logins ORDER BY logged_at DESC"
+            )
+        return [row[0] for row in cur.fetchall()]
 
 
+@st.cache_data(ttl=30, show_spinner=False)
 def load_class_scores(date_week: str | None) -> pd.DataFrame:
-    con = get_con()
-    if date_week:
-        df = pd.read_sql_query(
-            "SELECT student_id, date_week, score, note FROM class_scores WHERE date_week=?",
-            con,
-            params=[date_week],
-        )
-    else:
-        df = pd.read_sql_query(
-            "SELECT student_id, date_week, score, note FROM class_scores",
-            con,
-        )
-    con.close()
-    return df
+    with _read_lock():
+        con = get_read_con()
+        if date_week:
+            df = pd.read_sql_query(
+                "SELECT student_id, date_week, score, note FROM class_scores WHERE date_week=?",
+                con,
+                params=[date_week],
+            )
+        else:
+            df = pd.read_sql_query(
+                "SELECT student_id, date_week, score, note FROM class_scores",
+                con,
+            )
+    return _as_categories(df)
 
 
 def save_class_scores(date_week: str, score_rows) -> None:
@@ -268,30 +449,54 @@ def save_class_scores(date_week: str, score_rows) -> None:
     Stores one summed score per (student_id, date_week).
     """
     con = get_con()
-    cur = con.cursor()
-    for student_id, score, note in score_rows:
-        cur.execute(
+    with _write_lock(), con:
+        con.executemany(
             "INSERT INTO class_scores (student_id, date_week, score, note) VALUES (?,?,?,?)",
-            (student_id, date_week, score, note),
+            [
+                (student_id, date_week, score, note)
+                for student_id, score, note in score_rows
+            ],
         )
-    con.commit()
-    con.close()
+    load_class_scores.clear()
+    load_answer_review.clear()
+    load_score_totals.clear()
 
 
 def load_participation_counts(date_week: str | None) -> dict[str, int]:
     """Return participation count per student for a given date."""
     if not date_week:
         return {}
-    con = get_con()
-    df = pd.read_sql_query(
-        "SELECT student_id, participation FROM participation WHERE date_week=?",
-        con,
-        params=[date_week],
-    )
-    con.close()
-    if df.empty:
-        return {}
-    return dict(zip(df["student_id"], df["participation"]))
+    with _read_lock():
+        cur = get_read_con().execute(
+            "SELECT student_id, participation FROM participation WHERE date_week=?",
+            (date_week,),
+        )
+        return dict(cur.fetchall())
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def _participation_roster(date_week: str) -> list[tuple[str, int]]:
+    """
+    (student_id, participation) for the Participation tab, sorted by ID:
+    everyone who logged in or is already counted, 0 where not yet counted.
+    """
+    with _read_lock():
+        cur = get_read_con().execute(
+            """
+            WITH ids AS (
+                SELECT student_id FROM student_logins WHERE date_week = :d
+                UNION
+                SELECT student_id FROM participation WHERE date_week = :d
+            )
+            SELECT ids.student_id, COALESCE(p.participation, 0)
+            FROM ids
+            LEFT JOIN participation p
+                ON p.student_id = ids.student_id AND p.date_week = :d
+            ORDER BY ids.student_id
+            """,
+            {"d": date_week},
+        )
+        return cur.fetchall()
 
 
 def save_participation_counts(date_week: str, participation_rows) -> None:
@@ -299,68 +504,84 @@ def save_participation_counts(date_week: str, participation_rows) -> None:
     participation_rows: iterable of (student_id, participation_count)
     """
     con = get_con()
-    cur = con.cursor()
-    for student_id, count in participation_rows:
-        cur.execute(
+    with _write_lock(), con:
+        con.executemany(
             "INSERT INTO participation (student_id, date_week, participation) VALUES (?,?,?)",
-            (student_id, date_week, int(count)),
+            [
+                (student_id, date_week, int(count))
+                for student_id, count in participation_rows
+            ],
         )
-    con.commit()
-    con.close()
+    _participation_roster.clear()
+    load_score_totals.clear()
 
 
 def load_answer_counts(date_week: str | None) -> dict[str, int]:
     """Return number of answers submitted per student for given date."""
     if not date_week:
         return {}
-    con = get_con()
-    df = pd.read_sql_query(
-        "SELECT student_id, COUNT(*) AS total FROM answers WHERE date_week=? GROUP BY student_id",
-        con,
-        params=[date_week],
-    )
-    con.close()
-    if df.empty:
-        return {}
-    return dict(zip(df["student_id"], df["total"]))
+    with _read_lock():
+        cur = get_read_con().execute(
+            "SELECT student_id, COUNT(*) FROM answers WHERE date_week=? GROUP BY student_id",
+            (date_week,),
+        )
+        return dict(cur.fetchall())
 
 
 def load_student_groups(date_week: str | None) -> dict[str, str]:
     """Return mapping of student_id -> group_name for a given date."""
     if not date_week:
         return {}
-    con = get_con()
-    df = pd.read_sql_query(
-        """
-        SELECT student_id, MAX(COALESCE(group_name, '')) AS group_name
-        FROM answers
-        WHERE date_week=?
-        GROUP BY student_id
-        """,
-        con,
-        params=[date_week],
-    )
-    con.close()
-    if df.empty:
-        return {}
-    return dict(zip(df["student_id"], df["group_name"]))
+    with _read_lock():
+        cur = get_read_con().execute(
+            """
+            SELECT student_id, MAX(COALESCE(group_name, ''))
+            FROM answers
+            WHERE date_week=?
+            GROUP BY student_id
+            """,
+            (date_week,),
+        )
+        return dict(cur.fetchall())
 
 
+@st.cache_data(ttl=30, show_spinner=False)
+def load_score_totals() -> list[tuple[str, float, int]]:
+    """(student_id, activity total, participation total) across all dates."""
+    with _read_lock():
+        cur = get_read_con().execute(
+            """
+            SELECT student_id, SUM(act), SUM(part)
+            FROM (
+                SELECT student_id, COALESCE(SUM(score), 0.0) AS act, 0 AS part
+                FROM class_scores GROUP BY student_id
+                UNION ALL
+                SELECT student_id, 0.0, COALESCE(SUM(participation), 0)
+                FROM participation GROUP BY student_id
+            )
+            GROUP BY student_id
+            ORDER BY student_id
+            """
+        )
+        return cur.fetchall()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
 def load_score_weights() -> tuple[float, float, float]:
     """
     Load global weighting scheme (w_answers, w_class, w_part).
     If none is saved yet, return (1.0, 1.0, 1.0).
     (Currently not used in calculations, but kept for extension.)
     """
-    con = get_con()
-    df = pd.read_sql_query(
-        "SELECT w_answers, w_class, w_part FROM score_weights WHERE id = 1",
-        con,
-    )
-    con.close()
-    if df.empty:
+    with _read_lock():
+        # Row only on this cursor: named access without changing the shared connection
+        cur = get_read_con().cursor()
+        cur.row_factory = sqlite3.Row
+        row = cur.execute(
+            "SELECT w_answers, w_class, w_part FROM score_weights WHERE id = 1"
+        ).fetchone()
+    if row is None:
         return 1.0, 1.0, 1.0
-    row = df.iloc[0]
     w_answers = row["w_answers"] if row["w_answers"] is not None else 1.0
     w_class = row["w_class"] if row["w_class"] is not None else 1.0
     w_part = row["w_part"] if row["w_part"] is not None else 1.0
@@ -372,37 +593,41 @@ def save_score_weights(w_answers: float, w_class: float, w_part: float) -> None:
     Save global weighting scheme so it is reused in future sessions.
     """
     con = get_con()
-    cur = con.cursor()
-    cur.execute(
-        """
-        INSERT INTO score_weights (id, w_answers, w_class, w_part)
-        VALUES (1, ?, ?, ?)
-        ON CONFLICT(id) DO UPDATE SET
-            w_answers = excluded.w_answers,
-            w_class = excluded.w_class,
-            w_part = excluded.w_part
-        """,
-        (float(w_answers), float(w_class), float(w_part)),
-    )
-    con.commit()
-    con.close()
+    with _write_lock(), con:
+        con.execute(
+            """
+            INSERT INTO score_weights (id, w_answers, w_class, w_part)
+            VALUES (1, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                w_answers = excluded.w_answers,
+                w_class = excluded.w_class,
+                w_part = excluded.w_part
+            """,
+            (float(w_answers), float(w_class), float(w_part)),
+        )
+    load_score_weights.clear()
 
 
 # ---------- App ----------
-init_db()
 st.set_page_config(page_title="DADS9 - 5002 Score", page_icon="✅", layout="centered")
+_init_once()
 
 # session defaults
 st.session_state.setdefault("started", False)
 st.session_state.setdefault("q_index", 0)
-st.session_state.setdefault("answers", DEFAULT_QUESTIONS.copy())
 st.session_state.setdefault("show_preview", False)
 st.session_state.setdefault("teacher_loaded", False)
-st.session_state.setdefault("current_questions", DEFAULT_QUESTIONS.copy())
 st.session_state.setdefault("allow_edit_question", True)
 st.session_state.setdefault("group_name", "")
 st.session_state.setdefault("answers_export_df", None)
 st.session_state.setdefault("answers_export_label", "all")
+# mutable lists: only built on the first run of a session
+for _key in ("answers", "current_questions"):
+    if _key not in st.session_state:
+        st.session_state[_key] = list(DEFAULT_QUESTIONS)
+
+# one date string per script run, shared by every date input default
+today = str(date.today())
 
 st.title("📚 DADS9 - 5002 Score")
 
@@ -418,17 +643,40 @@ tab_student, tab_teacher, tab_teacher_part, tab_teacher_total = st.tabs(
 
 
 # ---------------- Student ----------------
+def _sync_current_question() -> None:
+    """Copy the visible question/answer widgets into the session lists."""
+    idx = st.session_state.q_index
+    if f"q_{idx}" in st.session_state:
+        st.session_state.current_questions[idx] = st.session_state[f"q_{idx}"]
+    if f"a_{idx}" in st.session_state:
+        st.session_state.answers[idx] = st.session_state[f"a_{idx}"]
+
+
+def _go_to_question(index: int) -> None:
+    _sync_current_question()
+    st.session_state.q_index = index
+    st.session_state.show_preview = False
+
+
+def _add_question() -> None:
+    _sync_current_question()
+    st.session_state.current_questions.append("")
+    st.session_state.answers.append("")
+    st.session_state.q_index = len(st.session_state.current_questions) - 1
+    st.session_state.show_preview = False
+
+
 with tab_student:
     st.subheader("Start")
     col1, col2 = st.columns(2)
     with col1:
-        student_id = st.text_input("Student ID", placeholder="e.g., S001")
+        student_id = st.text_input("Student ID", placeholder="e.g., S001").strip()
     with col2:
         date_week = st.text_input(
             "Date / Week",
-            value=str(date.today()),
+            value=today,
             help="Use same label as teacher's question set.",
-        )
+        ).strip()
 
     start_col, login_col = st.columns(2)
     with start_col:
@@ -436,17 +684,17 @@ with tab_student:
     with login_col:
         login_clicked = st.button("🔐 LOGIN", use_container_width=True)
 
-    selected_date = date_week.strip() or str(date.today())
+    selected_date = date_week or today
 
     if login_clicked:
-        if not student_id.strip():
+        if not student_id:
             st.warning("Please enter Student ID before logging in.")
         else:
-            log_student_login(student_id.strip(), selected_date)
+            log_student_login(student_id, selected_date)
             st.success("Login sent to teacher for attendance/scoring.")
 
     if start:
-        if not student_id.strip():
+        if not student_id:
             st.warning("Please enter Student ID.")
         else:
             question_set = load_questions(selected_date)
@@ -462,19 +710,17 @@ with tab_student:
 
     if st.session_state.started:
         st.divider()
-        questions = st.session_state.get("current_questions", DEFAULT_QUESTIONS).copy()
+        questions = st.session_state.current_questions
         total = len(questions)
 
         if total <= 0:
-            questions = [""]
+            questions.append("")
             total = 1
-            st.session_state.current_questions = questions
             st.session_state.answers = [""]
 
         q_idx = max(0, min(st.session_state.q_index, total - 1))
         st.session_state.q_index = q_idx
-        progress_value = max(0.0, min((q_idx + 1) / total, 1.0))
-        st.progress(progress_value, text=f"ข้อ {q_idx + 1}")
+        st.progress((q_idx + 1) / total, text=f"ข้อ {q_idx + 1}")
 
         key_q = f"q_{q_idx}"
         edited_q = st.text_input(
@@ -484,13 +730,14 @@ with tab_student:
             placeholder="Type your question here",
         )
         questions[q_idx] = edited_q
-        st.session_state.current_questions = questions
 
-        if len(st.session_state.answers) != total:
-            st.session_state.answers = (st.session_state.answers + [""] * total)[:total]
+        answers = st.session_state.answers
+        if len(answers) < total:
+            answers.extend([""] * (total - len(answers)))
+        del answers[total:]
         key_a = f"a_{q_idx}"
-        st.session_state.answers[q_idx] = st.text_area(
-            "Your Answer", value=st.session_state.answers[q_idx], height=140, key=key_a
+        answers[q_idx] = st.text_area(
+            "Your Answer", value=answers[q_idx], height=140, key=key_a
         )
 
         group_value = st.text_input(
@@ -500,36 +747,30 @@ with tab_student:
         )
         st.session_state.group_name = group_value.strip()
 
-        current_a_filled = st.session_state.answers[q_idx].strip() != ""
-        allow_next = current_a_filled
+        allow_next = answers[q_idx].strip() != ""
 
         c1, c2 = st.columns([1, 1])
         with c1:
-            if st.button("⬅️ Back", use_container_width=True, disabled=(q_idx == 0)):
-                st.session_state.q_index = max(0, q_idx - 1)
-                st.session_state.show_preview = False
+            st.button(
+                "⬅️ Back",
+                use_container_width=True,
+                disabled=(q_idx == 0),
+                on_click=_go_to_question,
+                args=(max(0, q_idx - 1),),
+            )
         with c2:
-            if st.button(
+            st.button(
                 "➡️ Next",
                 use_container_width=True,
                 disabled=(q_idx >= total - 1) or (not allow_next),
                 key=f"next_btn_{q_idx}",
-            ):
-                st.session_state.q_index = min(total - 1, q_idx + 1)
-                st.session_state.show_preview = False
-                st.rerun()
-
-        if st.button("➕ Add Question", use_container_width=True):
-            st.session_state.current_questions.append("")
-            st.session_state.answers.append("")
-            st.session_state.q_index = len(st.session_state.current_questions) - 1
-            st.session_state.show_preview = False
-            st.rerun()
+                on_click=_go_to_question,
+                args=(min(total - 1, q_idx + 1),),
+            )
 
-        all_filled = all(
-            a.strip() != ""
-            for a in st.session_state.answers[: len(st.session_state.current_questions)]
-        )
+        st.button("➕ Add Question", use_container_width=True, on_click=_add_question)
+
+        all_filled = all(a.strip() for a in answers)
 
         if st.button("👁️ Preview", use_container_width=True, disabled=not all_filled):
             st.session_state.show_preview = True
@@ -563,8 +804,8 @@ with tab_student:
                         for i in range(total)
                     ]
                     save_answers(
-                        student_id.strip(),
-                        date_week.strip(),
+                        student_id,
+                        date_week,
                         qa,
                         st.session_state.get("group_name", ""),
                     )
@@ -592,8 +833,8 @@ with tab_teacher:
             teacher_name = st.text_input("Teacher Name", placeholder="e.g., Ms. June")
         with m2:
             manage_date = st.text_input(
-                "Date / Week (for Question Set)", value=str(date.today())
-            )
+                "Date / Week (for Question Set)", value=today
+            ).strip()
 
         with st.expander("📝 Edit Question Set for this Date/Week", expanded=True):
             existing_dates = list_question_dates()
@@ -636,13 +877,13 @@ with tab_teacher:
             cqs1, cqs2 = st.columns([1, 1])
             with cqs1:
                 if st.button("💾 Save Question Set", use_container_width=True):
-                    save_question_set(manage_date.strip(), new_questions)
+                    save_question_set(manage_date, new_questions)
                     st.success(
                         f"Saved {len(new_questions)} questions for {manage_date}."
                     )
             with cqs2:
                 if st.button("🔄 Reset to Default", use_container_width=True):
-                    st.session_state["tmp_questions"] = DEFAULT_QUESTIONS.copy()
+                    st.session_state["tmp_questions"] = list(DEFAULT_QUESTIONS)
 
         st.divider()
 
@@ -673,44 +914,31 @@ with tab_teacher:
             st.session_state.teacher_loaded = True
 
         if st.session_state.get("teacher_loaded"):
-            df = load_answers(effective_filter or None)
-            if df.empty:
+            if effective_filter:
+                display_df = load_answer_review(effective_filter)
+            else:
+                # all dates: only materialise one page of the term's answers
+                n_pages = max(1, -(-count_answers() // ANSWER_PAGE_SIZE))
+                if st.session_state.get("answer_review_page", 1) > n_pages:
+                    st.session_state["answer_review_page"] = n_pages
+                page = st.number_input(
+                    f"Page ({ANSWER_PAGE_SIZE} rows each)",
+                    min_value=1,
+                    max_value=n_pages,
+                    step=1,
+                    key="answer_review_page",
+                )
+                st.caption(f"Page {int(page)} of {n_pages}")
+                display_df = load_answer_review(
+                    limit=ANSWER_PAGE_SIZE, offset=(int(page) - 1) * ANSWER_PAGE_SIZE
+                )
+            if display_df.empty:
                 st.info(
                     "No data found. Try adjusting filters or ask students to submit."
                 )
                 st.session_state["answers_export_df"] = None
                 st.session_state["answers_export_label"] = effective_filter or "all"
             else:
-                display_df = df.drop(columns=["checked"]) if "checked" in df else df
-                counts_df = (
-                    display_df.groupby(["student_id", "date_week"])
-                    .size()
-                    .reset_index(name="Answer Count")
-                )
-                display_df = display_df.merge(
-                    counts_df, how="left", on=["student_id", "date_week"]
-                )
-
-                class_scores_df = load_class_scores(None)
-                if not class_scores_df.empty:
-                    class_scores_df = class_scores_df.rename(
-                        columns={"score": "Activity Score"}
-                    )
-                    display_df = display_df.merge(
-                        class_scores_df[["student_id", "date_week", "Activity Score"]],
-                        how="left",
-                        on=["student_id", "date_week"],
-                    )
-                else:
-                    display_df["Activity Score"] = 0.0
-
-                display_df["Answer Count"] = (
-                    display_df["Answer Count"].fillna(0).astype(int)
-                )
-                display_df["Activity Score"] = (
-                    display_df["Activity Score"].fillna(0.0).round(2)
-                )
-
                 # --- Editable Activity Score only when a single date is selected ---
                 if effective_filter:
                     st.markdown(
@@ -747,14 +975,11 @@ with tab_teacher:
                         use_container_width=True,
                     ):
                         # SUM Activity Score per student for this date
-                        grouped = (
-                            edited_df.groupby("student_id")["Activity Score"]
-                            .sum()
-                            .reset_index()
-                        )
+                        grouped = edited_df.groupby("student_id", observed=True)[
+                            "Activity Score"
+                        ].sum()
                         rows_to_save = [
-                            (row["student_id"], float(row["Activity Score"]), "")
-                            for _, row in grouped.iterrows()
+                            (sid, float(score), "") for sid, score in grouped.items()
                         ]
                         save_class_scores(effective_filter, rows_to_save)
                         st.success(
@@ -793,7 +1018,7 @@ with tab_teacher_part:
     else:
         participation_date = st.text_input(
             "Date / Week (for Participation)",
-            value=str(date.today()),
+            value=today,
             key="participation_date_input",
             help="Use the same label that students selected when they pressed LOGIN.",
         )
@@ -802,89 +1027,56 @@ with tab_teacher_part:
         if not participation_date:
             st.info("กรุณากรอกวันที่ / สัปดาห์ ก่อน")
         else:
-            logged_students = list_logged_students(participation_date)
-            existing_part = load_participation_counts(participation_date)
-
-            ids_from_login = (
-                logged_students["student_id"].tolist()
-                if not logged_students.empty
-                else []
-            )
-            all_ids = sorted(set(ids_from_login) | set(existing_part.keys()))
+            roster = _participation_roster(participation_date)
 
-            if not all_ids:
+            if not roster:
                 st.info("ยังไม่มีนักเรียนกด LOGIN สำหรับวันที่นี้")
             else:
-                state_key = f"participation_values_{participation_date}"
-                if (state_key not in st.session_state) or (
-                    st.session_state.get("participation_date") != participation_date
-                ):
-                    st.session_state["participation_date"] = participation_date
-                    st.session_state[state_key] = {
-                        sid: existing_part.get(sid, 0) for sid in all_ids
-                    }
-                else:
-                    for sid in all_ids:
-                        st.session_state[state_key].setdefault(
-                            sid, existing_part.get(sid, 0)
-                        )
-
-                part_map = st.session_state[state_key]
-
                 st.markdown("**รายการนักเรียนที่กด LOGIN และจำนวนครั้งที่มีส่วนร่วมในคาบ**")
 
-                hcols = st.columns([3, 1, 1, 1])
-                hcols[0].markdown("**Student ID**")
-                hcols[1].markdown("**−**")
-                hcols[2].markdown("**Participation**")
-                hcols[3].markdown("**+**")
-
-                for sid in all_ids:
-                    cols = st.columns([3, 1, 1, 1])
-                    cols[0].write(sid)
-
-                    if cols[1].button(
-                        "➖",
-                        key=f"part_minus_{participation_date}_{sid}",
-                    ):
-                        part_map[sid] = max(0, part_map.get(sid, 0) - 1)
-                        st.session_state[state_key] = part_map
-                        st.rerun()
-
-                    cols[2].markdown(
-                        f"<div style='text-align:center;font-weight:bold;'>{part_map.get(sid, 0)}</div>",
-                        unsafe_allow_html=True,
+                part_df = pd.DataFrame(roster, columns=["Student ID", "Participation"])
+                # a form holds the edits client-side: one rerun on Save, not per cell
+                with st.form(f"participation_form_{participation_date}", border=False):
+                    edited_part = st.data_editor(
+                        part_df,
+                        hide_index=True,
+                        use_container_width=True,
+                        num_rows="fixed",
+                        column_config={
+                            "Participation": st.column_config.NumberColumn(
+                                "Participation",
+                                help="จำนวนครั้งที่มีส่วนร่วมในคาบ",
+                                min_value=0,
+                                step=1,
+                            )
+                        },
+                        disabled=["Student ID"],
+                        key=f"part_editor_{participation_date}",
                     )
-
-                    if cols[3].button(
-                        "➕",
-                        key=f"part_plus_{participation_date}_{sid}",
-                    ):
-                        part_map[sid] = part_map.get(sid, 0) + 1
-                        st.session_state[state_key] = part_map
-                        st.rerun()
-
-                summary_rows_part = [
-                    {"Student ID": sid, "Participation": part_map.get(sid, 0)}
-                    for sid in all_ids
-                ]
-                summary_df_part = pd.DataFrame(summary_rows_part)
-                st.markdown("**สรุปจำนวนครั้งที่มีส่วนร่วมตามนักเรียน**")
-                st.dataframe(
-                    summary_df_part,
-                    hide_index=True,
-                    use_container_width=True,
+                    save_clicked = st.form_submit_button(
+                        "💾 Save Participation", use_container_width=True
+                    )
+                # num_rows="fixed": the edited frame keeps the roster's rows in order
+                summary_df_part = edited_part.assign(
+                    Participation=edited_part["Participation"].fillna(0).astype(int)
                 )
 
-                if st.button(
-                    "💾 Save Participation",
-                    use_container_width=True,
-                    key="save_participation_btn",
-                ):
-                    rows = [(sid, part_map.get(sid, 0)) for sid in all_ids]
+                if save_clicked:
+                    rows = zip(
+                        summary_df_part["Student ID"],
+                        summary_df_part["Participation"].tolist(),
+                    )
                     save_participation_counts(participation_date, rows)
                     st.success("บันทึกจำนวนครั้งที่มีส่วนร่วมของนักเรียนเรียบร้อยแล้ว")
 
+                st.markdown("**สรุปจำนวนครั้งที่มีส่วนร่วมตามนักเรียน**")
+                st.table(
+                    summary_df_part.style.set_properties(
+                        subset=["Participation"],
+                        **{"text-align": "center", "font-weight": "bold"},
+                    ).hide(axis="index")
+                )
+
 
 # ---------------- Teacher (Score Overview) ----------------
 with tab_teacher_total:
@@ -903,87 +1095,38 @@ with tab_teacher_total:
             "ตารางภาพรวมคะแนน: รวม Activity Score ทุกวัน และคะแนน Participation (0–5) ต่อคน"
         )
 
-        con = get_con()
-        df_cls = pd.read_sql_query(
-            "SELECT student_id, date_week, score FROM class_scores",
-            con,
-        )
-        # participation: sum over all dates per student
-        df_part = pd.read_sql_query(
-            """
-            SELECT student_id, SUM(participation) AS total_participation
-            FROM participation
-            GROUP BY student_id
-            """,
-            con,
-        )
-        con.close()
+        # activity + participation summed over all dates, one row per student
+        totals = load_score_totals()
 
-        if df_cls.empty and df_part.empty:
+        if not totals:
             st.info("ยังไม่มีข้อมูลคะแนนกิจกรรมหรือการมีส่วนร่วมในระบบ")
         else:
-            # Sum Activity Scores per student across all dates
-            if df_cls.empty:
-                agg_scores = pd.DataFrame(columns=["student_id", "activity_total"])
-            else:
-                agg_scores = (
-                    df_cls.groupby("student_id")["score"]
-                    .sum()
-                    .reset_index(name="activity_total")
-                )
+            all_students, act_totals, part_totals = zip(*totals)
+            activity_total = np.asarray(act_totals, dtype=np.float64)
+            total_part_count = np.asarray(part_totals, dtype=np.float64)
 
-            # Total participation per student across all dates
-            if df_part.empty:
-                part_scores = pd.DataFrame(
-                    columns=["student_id", "total_participation"]
-                )
+            max_participation = total_part_count.max()
+            if max_participation > 0:
+                participation_score = total_part_count / max_participation * 5.0
             else:
-                part_scores = df_part.copy()
-                part_scores["total_participation"] = part_scores[
-                    "total_participation"
-                ].fillna(0).astype(int)
-
-            # Merge students from both tables
-            all_students = sorted(
-                set(agg_scores["student_id"].tolist())
-                | set(part_scores["student_id"].tolist())
-            )
-
-            # Build map for quick lookup
-            act_map = (
-                agg_scores.set_index("student_id")["activity_total"].to_dict()
-                if not agg_scores.empty
-                else {}
-            )
-            part_map_total = (
-                part_scores.set_index("student_id")["total_participation"].to_dict()
-                if not part_scores.empty
-                else {}
-            )
+                participation_score = np.zeros_like(total_part_count)
 
-            max_participation = max(part_map_total.values(), default=0)
+            total_score = activity_total + participation_score
 
-            rows = []
-            for sid in all_students:
-                activity_total = float(act_map.get(sid, 0.0))
-                total_part_count = int(part_map_total.get(sid, 0))
-
-                if max_participation > 0:
-                    participation_score = (total_part_count / max_participation) * 5.0
-                else:
-                    participation_score = 0.0
-
-                total_score = activity_total + participation_score
-
-                rows.append(
-                    {
-                        "Student ID": sid,
-                        "Participation Score": round(participation_score, 2),
-                        "Total Score": round(total_score, 2),
-                    }
-                )
-
-            overview_df = pd.DataFrame(rows)
+            overview_df = pd.DataFrame(
+                {
+                    "Student ID": all_students,
+                    "Participation Score": participation_score.round(2),
+                    "Total Score": total_score.round(2),
+                }
+            ).astype(
+                # Arrow-backed columns go to st.dataframe without re-conversion
+                {
+                    "Student ID": "string[pyarrow]",
+                    "Participation Score": "float64[pyarrow]",
+                    "Total Score": "float64[pyarrow]",
+                }
+            )
 
             # Sort by Total Score (highest first) and then Student ID
             overview_df = overview_df.sort_values(
@@ -995,13 +1138,16 @@ with tab_teacher_total:
                 overview_df,
                 hide_index=True,
                 use_container_width=True,
+                column_config={
+                    "Participation Score": st.column_config.NumberColumn(format="%.2f"),
+                    "Total Score": st.column_config.NumberColumn(format="%.2f"),
+                },
             )
 
             # Export CSV of this overview
-            csv_overview = overview_df.to_csv(index=False).encode("utf-8")
             st.download_button(
                 "⬇️ Export Score Overview CSV",
-                csv_overview,
+                _csv_bytes(overview_df),
                 file_name="score_overview.csv",
                 mime="text/csv",
                 use_container_width=True,